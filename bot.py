@@ -1,10 +1,18 @@
 import os
+import gzip
+import asyncio
 import json
+import mmap
+import hashlib
+import pickle
 import re
+import time
 import logging
+import functools
+from dataclasses import dataclass, field, fields, asdict
 from datetime import datetime, timedelta
 
-import requests
+import aiohttp
 import discord
 from discord.ext import commands
 from discord import app_commands
@@ -12,6 +20,11 @@ from apscheduler.schedulers.asyncio import AsyncIOScheduler
 import pytz
 from dotenv import load_dotenv
 
+try:
+    import orjson  # optional extra (pip install orjson): much faster JSON encode/decode (data.json, Torn API)
+except ImportError:
+    orjson = None
+
 # ---------------------------
 # Logging
 # ---------------------------
@@ -29,7 +42,14 @@ DIRECTOR_ID = int(os.getenv("DISCORD_USER_ID", "0"))         # your user ID
 GUILD_ID = int(os.getenv("DISCORD_GUILD_ID", "0"))           # your server ID
 TIMEZONE = os.getenv("TIMEZONE", "Europe/London")
 WELCOME_CHANNEL_NAME = os.getenv("WELCOME_CHANNEL", "general")
+EMPLOYEE_ROLE_ID = int(os.getenv("EMPLOYEE_ROLE_ID") or "0")     # optional; else found by name
+DIRECTOR_ROLE_ID = int(os.getenv("DIRECTOR_ROLE_ID") or "0")     # optional; else found by name
 DATA_FILE = os.getenv("DATA_FILE", "data.json")
+DATA_PRETTY = os.getenv("DATA_PRETTY", "0") == "1"              # indent data.json (debugging)
+DATA_GZIP = os.getenv("DATA_GZIP", "0") == "1"                  # store state as DATA_FILE.gz
+DATA_GZ_FILE = DATA_FILE + ".gz"
+SNAPSHOT_FILE = os.getenv("SNAPSHOT_FILE", "snapshot.pkl")        # last full Torn company response
+SYNC_HASH_FILE = os.getenv("SYNC_HASH_FILE", ".sync_hash")        # hash of the last synced command tree
 
 # Scheduler time: 19:30 UK
 SYNC_HOUR = 19
@@ -40,6 +60,16 @@ tz = pytz.timezone(TIMEZONE)
 GUILD_OBJ = discord.Object(id=GUILD_ID) if GUILD_ID else None
 _COMMANDS_SYNCED = False
 
+# guild id -> welcome channel id, resolved by name once and then looked up by ID
+_welcome_map: dict[int, int] = {}
+
+# Shared HTTP session for the Torn API (created on first use, closed with the bot)
+aiohttp_session: aiohttp.ClientSession | None = None
+
+# Short-lived cache of the last Torn company response
+COMPANY_CACHE_TTL = 60  # seconds
+_company_cache = {"ts": 0.0, "data": None}
+
 # ---------------------------
 # Helper decorator to avoid conditional @ lines
 # ---------------------------
@@ -58,90 +88,378 @@ intents = discord.Intents.default()
 intents.guilds = True
 intents.members = True           # for on_member_join
 intents.message_content = True   # optional
-bot = commands.Bot(command_prefix="!", intents=intents)
+
+class CompanyBot(commands.Bot):
+    async def close(self):
+        # Write out pending changes before the loop goes away
+        if store.loaded:
+            try:
+                await store.flush()
+            except Exception:
+                logging.exception("Failed to flush data on shutdown")
+        if aiohttp_session is not None and not aiohttp_session.closed:
+            await aiohttp_session.close()
+        await super().close()
+
+bot = CompanyBot(command_prefix="!", intents=intents)
+
+# ---------------------------
+# Background tasks
+# ---------------------------
+# Strong references so fire-and-forget tasks aren't garbage-collected mid-flight
+_bg: set[asyncio.Task] = set()
+
+def _task_done(t: asyncio.Task):
+    _bg.discard(t)
+    if not t.cancelled() and t.exception():
+        logging.error("Background task failed", exc_info=t.exception())
+
+def spawn(coro) -> asyncio.Task:
+    t = asyncio.create_task(coro)
+    _bg.add(t)
+    t.add_done_callback(_task_done)
+    return t
 
 # ---------------------------
 # Storage helpers
 # ---------------------------
+# Below this size a plain read() beats setting up an mmap
+MMAP_MIN_SIZE = 64 * 1024
+
+# Path + mtime of the data file as the bot last read or wrote it; get_data() uses it to spot outside edits
+_data_cache = {"path": None, "mtime": -1}
+
+def _empty_data() -> dict:
+    return {"employees": [], "trained": {}, "rotation_cycle": 0, "trains_available": None, "last_sync": None}
+
+def _dumps(d: dict) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(d, option=orjson.OPT_INDENT_2 if DATA_PRETTY else None)
+    if DATA_PRETTY:
+        return json.dumps(d, indent=2).encode("utf-8")
+    return json.dumps(d, separators=(",", ":")).encode("utf-8")
+
+def _loads(raw: bytes):
+    if orjson is not None:
+        return orjson.loads(raw)
+    return json.loads(raw)
+
+def _digest(obj) -> bytes:
+    if orjson is not None:
+        raw = orjson.dumps(obj, option=orjson.OPT_SORT_KEYS)
+    else:
+        raw = json.dumps(obj, sort_keys=True).encode("utf-8")
+    return hashlib.blake2b(raw).digest()
+
+def _data_file() -> tuple[str, int] | None:
+    # Whichever of data.json / data.json.gz is newer, whatever DATA_GZIP says now, so
+    # toggling the flag never falls back to a stale copy. (path, mtime), or None if neither exists.
+    found = None
+    for path in (DATA_GZ_FILE, DATA_FILE):
+        try:
+            mtime = os.stat(path).st_mtime_ns
+        except FileNotFoundError:
+            continue
+        if found is None or mtime > found[1]:
+            found = (path, mtime)
+    return found
+
 def load_data() -> dict:
-    if not os.path.exists(DATA_FILE):
-        return {"employees": [], "trained": {}, "rotation_cycle": 0, "company_snapshot": {}, "last_sync": None}
+    found = _data_file()
+    if found is None:
+        return _empty_data()
+    path, mtime = found
     try:
-        with open(DATA_FILE, "r", encoding="utf-8") as f:
-            return json.load(f)
+        with open(path, "rb") as f:
+            if orjson is not None and path != DATA_GZ_FILE and os.fstat(f.fileno()).st_size >= MMAP_MIN_SIZE:
+                # Large plain file: let orjson parse the mapped pages directly
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                    with memoryview(mm) as view:
+                        obj = orjson.loads(view)
+            else:
+                raw = f.read()
+                if path == DATA_GZ_FILE:
+                    raw = gzip.decompress(raw)
+                obj = _loads(raw)
     except Exception:
-        logging.exception("Failed to load data.json")
-        return {"employees": [], "trained": {}, "rotation_cycle": 0, "company_snapshot": {}, "last_sync": None}
+        logging.exception(f"Failed to load {path}")
+        return _empty_data()
+    if not isinstance(obj, dict):
+        logging.error(f"Failed to load {path}: expected a JSON object, got {type(obj).__name__}")
+        return _empty_data()
+    _data_cache["path"] = path
+    _data_cache["mtime"] = mtime
+    return obj
+
+def save_data(d: dict) -> bool:
+    # Write a temp file and rename it over the target so readers never see a partial file
+    path = DATA_GZ_FILE if DATA_GZIP else DATA_FILE
+    tmp = path + ".tmp"
+    try:
+        payload = _dumps(d)
+        if DATA_GZIP:
+            payload = gzip.compress(payload, compresslevel=1, mtime=0)
+        with open(tmp, "wb", buffering=65536) as f:
+            f.write(payload)
+            f.flush()
+            os.fsync(f.fileno())
+            mtime = os.fstat(f.fileno()).st_mtime_ns
+        os.replace(tmp, path)
+        _data_cache["path"] = path
+        _data_cache["mtime"] = mtime
+        # Drop the other format so two diverging copies never sit side by side
+        other = DATA_FILE if DATA_GZIP else DATA_GZ_FILE
+        try:
+            os.remove(other)
+        except FileNotFoundError:
+            pass
+        except OSError:
+            logging.exception(f"Failed to remove {other}")
+        return True
+    except Exception:
+        _data_cache["mtime"] = -1
+        logging.exception(f"Failed to save {path}")
+        return False
 
-def save_data(d: dict):
+@dataclass(slots=True)
+class BotState:
+    employees: list[str] = field(default_factory=list)
+    trained: dict[str, str] = field(default_factory=dict)
+    rotation_cycle: int = 0
+    trains_available: int | None = None
+    last_sync: str | None = None
+
+    @classmethod
+    def from_dict(cls, d: dict) -> "BotState":
+        known = {f.name for f in fields(cls)}
+        state = cls(**{k: v for k, v in d.items() if k in known})
+        # Older files kept the whole Torn response under company_snapshot
+        if state.trains_available is None:
+            detailed = (d.get("company_snapshot") or {}).get("company_detailed") or {}
+            state.trains_available = detailed.get("trains_available")
+        return state
+
+def save_snapshot(snap: dict):
+    """Keep the full Torn response in a pickle sidecar so data.json stays small.
+    Nothing in the bot reads it back today; it's there for inspection and future features."""
+    tmp = SNAPSHOT_FILE + ".tmp"
     try:
-        with open(DATA_FILE, "w", encoding="utf-8") as f:
-            json.dump(d, f, indent=2)
+        with open(tmp, "wb") as f:
+            pickle.dump(snap, f, protocol=5)
+        os.replace(tmp, SNAPSHOT_FILE)
     except Exception:
-        logging.exception("Failed to save data.json")
+        logging.exception("Failed to save snapshot")
+
+class Store:
+    """Resident bot state. Loaded once in on_ready, mutated in place by commands,
+    and written back by flush_loop() shortly after mark_dirty() has been called."""
+
+    def __init__(self):
+        self.data = BotState()
+        self.dirty = False
+        self.loaded = False
+        self.lock = asyncio.Lock()
+        self.changed = asyncio.Event()         # wakes flush_loop
+        # Digest of the last merged Torn roster (memory only); unchanged roster => skip the merge
+        self.roster_hash: bytes | None = None
+        # Derived from data.employees/trained by reindex(); memory only
+        self.name_index: dict[str, str] = {}   # norm(name) -> canonical employee name
+        self.untrained: list[str] = []         # rotation order
+        self._text: dict[str, str] = {}        # rendered /rotation and /remaining replies
+
+    async def load(self):
+        self.data = BotState.from_dict(await asyncio.to_thread(load_data))
+        self.reindex()
+        self.loaded = True
+
+    def reindex(self):
+        """Rebuild derived lookups after the roster changes or the rotation resets."""
+        trained = self.data.trained
+        self.name_index = {norm(e): e for e in self.data.employees}
+        self.untrained = [e for e in self.data.employees if trained.get(e, "N") != "Y"]
+        self._text.clear()
+
+    def mark_dirty(self):
+        # Every state change goes through here, so it also drops the rendered replies
+        self.dirty = True
+        self._text.clear()
+        self.changed.set()
+
+    def rotation_text(self) -> str:
+        text = self._text.get("rotation")
+        if text is None:
+            trained = self.data.trained
+            lines = [f"{i}. {e} — {'✅' if trained.get(e) == 'Y' else '❌'}" for i, e in enumerate(self.data.employees, 1)]
+            if all_trained():
+                lines.append("\n🔁 All trained — rotation will reset automatically on the next mark.")
+            text = self._text["rotation"] = "**Training Rotation Order:**\n" + "\n".join(lines)
+        return text
+
+    def remaining_text(self) -> str:
+        text = self._text.get("remaining")
+        if text is None:
+            if self.untrained:
+                text = "**Employees left to train:**\n" + "\n".join(f"❌ {name}" for name in self.untrained)
+            else:
+                text = "✅ All employees are trained this rotation!"
+            self._text["remaining"] = text
+        return text
+
+    async def flush(self):
+        async with self.lock:
+            if not self.dirty:
+                return
+            self.dirty = False
+            # Snapshot on the loop so the worker thread never sees a half-mutated state
+            if not await asyncio.to_thread(save_data, asdict(self.data)):
+                self.dirty = True
+
+store = Store()
+
+async def get_data() -> BotState:
+    """Resident state for command handlers. Costs a stat() per data file; reloads only if
+    the data file was edited outside the bot and there are no unsaved changes."""
+    if store.loaded and not store.dirty and not store.lock.locked():
+        found = _data_file()
+        if found is None:
+            return store.data
+        path, mtime = found
+        if path != _data_cache["path"] or mtime != _data_cache["mtime"]:
+            # Same off-loop read as Store.load(); a large file shouldn't stall the gateway
+            fresh = await asyncio.to_thread(load_data)
+            if store.dirty or store.lock.locked():
+                # A command changed state while we were reading; the next flush wins
+                return store.data
+            # load_data only updates _data_cache on a successful parse; keep what we have otherwise
+            if _data_cache["path"] == path and _data_cache["mtime"] == mtime:
+                logging.info(f"{path} changed on disk; reloaded.")
+                store.data = BotState.from_dict(fresh)
+                store.roster_hash = None
+                store.reindex()
+            else:
+                # Remember the bad version so it's only retried once the file changes again
+                _data_cache["path"] = path
+                _data_cache["mtime"] = mtime
+    return store.data
+
+FLUSH_DELAY = 1.0  # seconds; marks landing within this window share one write
+_flush_task: asyncio.Task | None = None
+
+async def flush_loop():
+    while True:
+        await store.changed.wait()
+        await asyncio.sleep(FLUSH_DELAY)
+        store.changed.clear()
+        await store.flush()
+        if store.dirty:
+            # Save failed; try again after the next delay
+            store.changed.set()
 
 # ---------------------------
 # Rotation helpers
 # ---------------------------
-def norm(name: str) -> str:
-    return re.sub(r"\s+", " ", (name or "")).strip().casefold()
-
-def all_trained(data: dict) -> bool:
-    emps = data.get("employees", [])
-    trained = data.get("trained", {})
-    return bool(emps) and all(trained.get(e, "N") == "Y" for e in emps)
+_WS_RE = re.compile(r"\s+")
 
-def reset_rotation(data: dict):
-    trained = data.setdefault("trained", {})
-    for e in data.get("employees", []):
-        trained[e] = "N"
-    data["rotation_cycle"] = data.get("rotation_cycle", 0) + 1
-    save_data(data)
-    logging.info(f"Rotation reset (cycle #{data['rotation_cycle']}).")
+@functools.lru_cache(maxsize=512)
+def norm(name: str) -> str:
+    name = name or ""
+    # Fast path: no runs of spaces and no other whitespace (tabs, NBSP etc. aren't printable)
+    if "  " not in name and name.isprintable():
+        return name.strip().casefold()
+    return _WS_RE.sub(" ", name).strip().casefold()
+
+def all_trained() -> bool:
+    # O(1): store.untrained is kept in step with every trained-flag change
+    return bool(store.data.employees) and not store.untrained
+
+def reset_rotation(state: BotState, persist: bool = True):
+    """Mark everyone untrained and bump the cycle.
+    persist=False leaves mark_dirty() to a caller that batches its own changes."""
+    for e in state.employees:
+        state.trained[e] = "N"
+    state.rotation_cycle += 1
+    store.untrained = list(state.employees)
+    logging.info(f"Rotation reset (cycle #{state.rotation_cycle}).")
+    if persist:
+        store.mark_dirty()
+
+# A role with a configured ID is checked by ID only (O(1), survives renames);
+# roles without one are matched by name in a single pass over the member's roles
+_ROLE_IDS = {"employee": EMPLOYEE_ROLE_ID, "director": DIRECTOR_ROLE_ID}
+_DIRECTOR_ROLES = frozenset(n for n in ("director",) if not _ROLE_IDS[n])
+_COMPANY_ROLES = frozenset(n for n in ("employee", "director") if not _ROLE_IDS[n])
+_DIRECTOR_ROLE_IDS = tuple(_ROLE_IDS[n] for n in ("director",) if _ROLE_IDS[n])
+_COMPANY_ROLE_IDS = tuple(_ROLE_IDS[n] for n in ("employee", "director") if _ROLE_IDS[n])
+
+def _has_role(interaction: discord.Interaction, allowed: frozenset, role_ids: tuple[int, ...]) -> bool:
+    user = interaction.user
+    if role_ids:
+        get_role = getattr(user, "get_role", None)
+        if get_role and any(get_role(rid) is not None for rid in role_ids):
+            return True
+    return bool(allowed) and any(r.name.lower() in allowed for r in getattr(user, "roles", []))
 
 def director_check(interaction: discord.Interaction) -> bool:
     if interaction.user.id == DIRECTOR_ID:
         return True
-    roles = [r.name.lower() for r in getattr(interaction.user, "roles", [])]
-    return "director" in roles
+    return _has_role(interaction, _DIRECTOR_ROLES, _DIRECTOR_ROLE_IDS)
 
 def company_role_check(interaction: discord.Interaction) -> bool:
     if interaction.user.id == DIRECTOR_ID:
         return True
-    roles = [r.name.lower() for r in getattr(interaction.user, "roles", [])]
-    return ("employee" in roles) or ("director" in roles)
+    return _has_role(interaction, _COMPANY_ROLES, _COMPANY_ROLE_IDS)
+
+# guild id -> Employee role id, so /verify doesn't scan every role by name
+_role_cache: dict[int, int] = {}
+
+def employee_role_for(guild: discord.Guild) -> discord.Role | None:
+    if EMPLOYEE_ROLE_ID:
+        # Pinned: never hand out a same-named role that company_role_check wouldn't accept
+        return guild.get_role(EMPLOYEE_ROLE_ID)
+    rid = _role_cache.get(guild.id)
+    role = guild.get_role(rid) if rid else None
+    if role is None:
+        # Find Employee role (case-insensitive)
+        role = discord.utils.find(lambda r: r.name.lower() == "employee", guild.roles)
+        if role:
+            _role_cache[guild.id] = role.id
+    return role
+
+def welcome_channel_for(guild: discord.Guild) -> discord.TextChannel | None:
+    cid = _welcome_map.get(guild.id)
+    channel = guild.get_channel(cid) if cid else None
+    if channel is None:
+        channel = discord.utils.get(guild.text_channels, name=WELCOME_CHANNEL_NAME)
+        if channel:
+            _welcome_map[guild.id] = channel.id
+    return channel
 
 async def verify_employee(member: discord.Member) -> str:
     """Check member nickname against Torn employees and assign Employee role if eligible."""
     guild = member.guild
 
-    # Find Employee role (case-insensitive)
-    employee_role = discord.utils.find(lambda r: r.name.lower() == "employee", guild.roles)
+    employee_role = employee_role_for(guild)
     if not employee_role:
+        if EMPLOYEE_ROLE_ID:
+            return "⚠️ The configured **Employee** role (EMPLOYEE_ROLE_ID) doesn't exist in this server. Ask the director to fix it."
         return "⚠️ I can't find an **Employee** role in this server. Ask the director to create one."
 
-    data = load_data()
-    employees = data.get("employees", [])
-    if not employees:
+    if not (await get_data()).employees:
         return "⚠️ I don't have any company employees loaded yet. Ask the director to run `/forceupdate` first."
 
     # Use nickname if set, otherwise username
     nickname = member.nick or member.name
 
     # Expect format like: Harry [1925807] → base name "Harry"
-    base_name = re.split(r"\[|\(", nickname)[0].strip()
+    base_name = nickname.partition("[")[0].partition("(")[0].strip()
     if not base_name:
         return (
             "⚠️ I couldn't parse your Torn name from your Discord nickname.\n"
             "Set your nickname to something like `Name [1234567]` and try `/verify` again."
         )
 
-    # Try to match case-insensitive against employee list
-    match = None
-    for e in employees:
-        if norm(e) == norm(base_name):
-            match = e
-            break
+    # Case-insensitive match against the employee index (built on load and sync)
+    match = store.name_index.get(norm(base_name))
 
     if not match:
         return (
@@ -170,16 +488,43 @@ async def verify_employee(member: discord.Member) -> str:
 # ---------------------------
 # Torn API
 # ---------------------------
-def get_company_data() -> dict | None:
+def http_session() -> aiohttp.ClientSession:
+    global aiohttp_session
+    if aiohttp_session is None or aiohttp_session.closed:
+        aiohttp_session = aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(limit=4),
+            timeout=aiohttp.ClientTimeout(total=15),
+            headers={"User-Agent": "torn-company-bot/1.0"},
+        )
+    return aiohttp_session
+
+# Serialises snapshot writes so two in-flight writes never share the .tmp file
+_snapshot_lock = asyncio.Lock()
+
+async def write_snapshot(snap: dict):
+    async with _snapshot_lock:
+        await asyncio.to_thread(save_snapshot, snap)
+
+async def get_company_data(force: bool = False) -> dict | None:
+    """Fetch company details + employees, reusing a response younger than COMPANY_CACHE_TTL
+    unless force is set."""
+    if not force and _company_cache["data"] is not None and time.monotonic() - _company_cache["ts"] < COMPANY_CACHE_TTL:
+        return _company_cache["data"]
     if not TORN_API_KEY:
         logging.error("Missing TORN_API_KEY")
         return None
     url = f"https://api.torn.com/company/?selections=detailed,employees&key={TORN_API_KEY}"
     try:
-        r = requests.get(url, timeout=15)
-        r.raise_for_status()
-        data = r.json()
+        async with http_session().get(url) as r:
+            r.raise_for_status()
+            raw = await r.read()
+        # orjson parses fast enough to stay on the loop; stdlib json goes to a worker thread
+        data = _loads(raw) if orjson is not None else await asyncio.to_thread(json.loads, raw)
         if "company_detailed" in data and "company_employees" in data:
+            _company_cache["ts"] = time.monotonic()
+            _company_cache["data"] = data
+            # Write-only sidecar: don't make the sync wait on the disk
+            spawn(write_snapshot(data))
             return data
         logging.error("Unexpected Torn API structure")
         return None
@@ -187,83 +532,181 @@ def get_company_data() -> dict | None:
         logging.exception("Error fetching Torn API")
         return None
 
-def sync_torn_data() -> bool:
+# Serialises syncs so overlapping scheduler ticks / /forceupdate don't double-fetch
+_sync_lock = asyncio.Lock()
+
+async def sync_torn_data(force: bool = False) -> BotState | None:
     """
     Fetch Torn company, merge rotation safely (preserve 'trained'),
     drop leavers, init new hires, auto-reset if everyone is trained.
+    force bypasses the response cache. Returns the updated state, or None if the Torn fetch failed.
     """
-    base = load_data()
-    company = get_company_data()
+    async with _sync_lock:
+        return await _sync_torn_data(force)
+
+async def _sync_torn_data(force: bool) -> BotState | None:
+    company = await get_company_data(force)
     if not company or "company_employees" not in company:
         logging.error("Error: invalid Torn data.")
-        return False
-
-    # Oldest first, then name
-    api_emps = [emp["name"] for _, emp in sorted(
-        company["company_employees"].items(),
-        key=lambda kv: (-int(kv[1].get("days_in_company", 0)), kv[1].get("name", "").lower())
-    )]
-
-    trained = base.setdefault("trained", {})
-
-    # Drop leavers
-    for k in list(trained.keys()):
-        if k not in api_emps:
-            trained.pop(k, None)
-
-    # Init new hires
-    for e in api_emps:
-        trained.setdefault(e, "N")
-
-    base["employees"] = api_emps
-    base["company_snapshot"] = company
-    base["last_sync"] = datetime.now(tz).strftime("%Y-%m-%d %H:%M")
-    save_data(base)
-
-    if all_trained(base):
-        reset_rotation(base)
+        return None
 
-    trains = company["company_detailed"].get("trains_available", 0)
-    logging.info(f"[sync] Employees: {len(api_emps)}, trains={trains}")
-    return True
+    data = await get_data()
+    trains = int(company["company_detailed"].get("trains_available", 0) or 0)
+    # Oldest first, then name; keys are built once so the sort compares plain tuples
+    decorated = [
+        (-int(emp.get("days_in_company", 0) or 0), emp.get("name", "").lower(), emp["name"])
+        for emp in company["company_employees"].values()
+    ]
+    decorated.sort()
+    # Only names and tenure feed the merge; status/last_action/wage churn on every fetch
+    roster_hash = _digest(decorated)
+    roster_changed = roster_hash != store.roster_hash
+    changed = roster_changed or trains != data.trains_available
+
+    if roster_changed:
+        api_emps = [t[2] for t in decorated]
+
+        # One pass: keeps existing flags, drops leavers, inits new hires as "N"
+        trained = data.trained
+        data.trained = {e: trained.get(e, "N") for e in api_emps}
+        data.employees = api_emps
+        store.roster_hash = roster_hash
+
+    last_sync = datetime.now(tz).strftime("%Y-%m-%d %H:%M")
+    if changed:
+        # Only trains_available is persisted; the full response lives in snapshot.pkl
+        data.trains_available = trains
+        store.reindex()
+        if all_trained():
+            reset_rotation(data, persist=False)
+    if changed or last_sync != data.last_sync:
+        data.last_sync = last_sync
+        store.mark_dirty()
+
+    logging.info(f"[sync] Employees: {len(data.employees)}, trains={trains}, changed={changed}")
+    return data
 
 # ---------------------------
 # Scheduler
 # ---------------------------
 scheduler = AsyncIOScheduler(timezone=tz)
 
+# Next scheduled sync; only recomputed once it has passed
+_next_sync_at: datetime | None = None
+
+def next_sync_time(now: datetime) -> datetime:
+    global _next_sync_at
+    if _next_sync_at is None or _next_sync_at <= now:
+        day = now.date()
+        target = tz.localize(datetime(day.year, day.month, day.day, SYNC_HOUR, SYNC_MINUTE))
+        if target <= now:
+            day += timedelta(days=1)
+            target = tz.localize(datetime(day.year, day.month, day.day, SYNC_HOUR, SYNC_MINUTE))
+        _next_sync_at = target
+    return _next_sync_at
+
+# Director's DM channel, resolved on first use
+_director_dm: discord.DMChannel | None = None
+
 async def dm_director(message: str):
+    global _director_dm
     try:
-        user = await bot.fetch_user(DIRECTOR_ID)
-        if user:
-            await user.send(message)
+        if _director_dm is None:
+            # Gateway cache first; only hit the REST API if the user isn't cached
+            user = bot.get_user(DIRECTOR_ID) or await bot.fetch_user(DIRECTOR_ID)
+            _director_dm = user.dm_channel or await user.create_dm()
+        await _director_dm.send(message)
     except Exception:
         logging.exception("Failed to DM director")
 
-def scheduled_sync():
-    ok = sync_torn_data()
-    if not ok:
+# Director DMs go through one worker so they're sent in order and failures are logged
+_dm_queue: asyncio.Queue[str] = asyncio.Queue()
+_dm_task: asyncio.Task | None = None
+
+def queue_director_dm(message: str):
+    _dm_queue.put_nowait(message)
+
+async def dm_worker():
+    while True:
+        message = await _dm_queue.get()
+        try:
+            await dm_director(message)
+        finally:
+            _dm_queue.task_done()
+
+async def scheduled_sync():
+    # Coroutine job: AsyncIOScheduler awaits it on the bot's event loop
+    data = await sync_torn_data(force=True)
+    if data is None:
         return
-    data = load_data()
-    trains = int(data.get("company_snapshot", {}).get("company_detailed", {}).get("trains_available", 0) or 0)
+    trains = data.trains_available or 0
     if trains >= 10:
-        bot.loop.create_task(dm_director(f"🔔 Trains available: **{trains}** — time to train two employees (5× each)."))
+        queue_director_dm(f"🔔 Trains available: **{trains}** — time to train two employees (5× each).")
+
+# ---------------------------
+# Command sync
+# ---------------------------
+def command_tree_hash() -> str:
+    payload = [GUILD_ID]
+    for c in bot.tree.get_commands() + (bot.tree.get_commands(guild=GUILD_OBJ) if GUILD_OBJ else []):
+        try:
+            payload.append(c.to_dict(bot.tree))
+        except TypeError:  # discord.py < 2.4
+            payload.append(c.to_dict())
+    return _digest(payload).hex()
+
+def read_sync_hash() -> str | None:
+    try:
+        with open(SYNC_HASH_FILE, "r", encoding="utf-8") as f:
+            return f.read().strip() or None
+    except FileNotFoundError:
+        return None
+
+def write_sync_hash(h: str | None):
+    try:
+        if h is None:
+            if os.path.exists(SYNC_HASH_FILE):
+                os.remove(SYNC_HASH_FILE)
+            return
+        with open(SYNC_HASH_FILE, "w", encoding="utf-8") as f:
+            f.write(h)
+    except Exception:
+        logging.exception("Failed to write sync hash")
+
+async def sync_commands():
+    if GUILD_OBJ:
+        await bot.tree.sync(guild=GUILD_OBJ)
+        logging.info(f"🔁 Synced slash commands to guild {GUILD_ID}.")
+    else:
+        await bot.tree.sync()
+        logging.info("🔁 Synced slash commands globally (no GUILD_ID set).")
+    write_sync_hash(command_tree_hash())
 
 # ---------------------------
 # Events
 # ---------------------------
 @bot.event
 async def on_ready():
-    global _COMMANDS_SYNCED
+    global _COMMANDS_SYNCED, _flush_task, _dm_task
+    if not store.loaded:
+        await store.load()
+    if _flush_task is None or _flush_task.done():
+        _flush_task = spawn(flush_loop())
+    if _dm_task is None or _dm_task.done():
+        _dm_task = spawn(dm_worker())
+
+    _welcome_map.clear()
+    for guild in bot.guilds:
+        welcome_channel_for(guild)
+
     try:
-        # Sync ONLY to the guild once; do NOT copy globals (prevents duplicates)
+        # Sync ONLY to the guild once; do NOT copy globals (prevents duplicates).
+        # Across restarts, skip the sync entirely if the command definitions haven't changed.
         if not _COMMANDS_SYNCED:
-            if GUILD_OBJ:
-                await bot.tree.sync(guild=GUILD_OBJ)
-                logging.info(f"🔁 Synced slash commands to guild {GUILD_ID}.")
+            if read_sync_hash() == command_tree_hash():
+                logging.info("🔁 Command tree unchanged since last sync; skipping.")
             else:
-                await bot.tree.sync()
-                logging.info("🔁 Synced slash commands globally (no GUILD_ID set).")
+                await sync_commands()
             _COMMANDS_SYNCED = True
         else:
             logging.info("🔁 Commands already synced; skipping re-sync.")
@@ -275,7 +718,12 @@ async def on_ready():
     # Start scheduler once
     try:
         if not scheduler.running:
-            scheduler.add_job(scheduled_sync, "cron", hour=SYNC_HOUR, minute=SYNC_MINUTE)
+            # scheduled_sync is a coroutine, so it runs on the bot loop (no executor thread).
+            # A late or doubled tick collapses into a single run.
+            scheduler.add_job(
+                scheduled_sync, "cron", hour=SYNC_HOUR, minute=SYNC_MINUTE,
+                id="daily_sync", coalesce=True, max_instances=1, misfire_grace_time=300,
+            )
             scheduler.start()
             logging.info("📅 Scheduler started (daily 19:30 UK).")
     except Exception:
@@ -283,7 +731,7 @@ async def on_ready():
 
 @bot.event
 async def on_member_join(member: discord.Member):
-    channel = discord.utils.get(member.guild.text_channels, name=WELCOME_CHANNEL_NAME)
+    channel = welcome_channel_for(member.guild)
     if channel:
         try:
             await channel.send(
@@ -293,6 +741,31 @@ async def on_member_join(member: discord.Member):
         except Exception:
             logging.exception("Failed to send welcome message")
 
+# Channel changes can move the welcome channel; re-resolve it on the next join
+@bot.event
+async def on_guild_channel_create(channel: discord.abc.GuildChannel):
+    if channel.name == WELCOME_CHANNEL_NAME:
+        _welcome_map.pop(channel.guild.id, None)
+
+@bot.event
+async def on_guild_channel_update(before: discord.abc.GuildChannel, after: discord.abc.GuildChannel):
+    if before.name != after.name:
+        _welcome_map.pop(after.guild.id, None)
+
+@bot.event
+async def on_guild_channel_delete(channel: discord.abc.GuildChannel):
+    if _welcome_map.get(channel.guild.id) == channel.id:
+        _welcome_map.pop(channel.guild.id, None)
+
+@bot.event
+async def on_guild_role_update(before: discord.Role, after: discord.Role):
+    if before.name != after.name:
+        _role_cache.pop(after.guild.id, None)
+
+@bot.event
+async def on_guild_role_delete(role: discord.Role):
+    _role_cache.pop(role.guild.id, None)
+
 # ---------------------------
 # Slash Commands (guild-scoped to avoid duplicates)
 # ---------------------------
@@ -303,7 +776,8 @@ async def on_member_join(member: discord.Member):
 @app_commands.check(director_check)
 async def forceupdate(interaction: discord.Interaction):
     await interaction.response.defer(ephemeral=True)
-    ok = sync_torn_data()
+    # Uses the cached response if it's under COMPANY_CACHE_TTL old, so repeated calls don't hit Torn
+    ok = await sync_torn_data() is not None
     if ok:
         await interaction.followup.send("✅ Torn company data synced successfully.")
     else:
@@ -319,31 +793,24 @@ async def forceupdate_error(interaction: discord.Interaction, error: app_command
 @bot.tree.command(name="status", description="Show company sync and training status summary")
 @app_commands.check(company_role_check)
 async def status(interaction: discord.Interaction):
-    await interaction.response.defer()
     try:
-        data = load_data()
-        emps = data.get("employees", [])
-        trained = data.get("trained", {})
-        trained_count = sum(1 for v in trained.values() if v == "Y")
+        data = await get_data()
+        emps = data.employees
         total = len(emps)
+        trained_count = total - len(store.untrained)
 
-        snap = data.get("company_snapshot", {})
-        trains = snap.get("company_detailed", {}).get("trains_available", "N/A")
-        last_sync = data.get("last_sync", "N/A")
+        trains = data.trains_available if data.trains_available is not None else "N/A"
+        last_sync = data.last_sync or "N/A"
 
         now = datetime.now(tz)
-        next_sync_time = now.replace(hour=SYNC_HOUR, minute=SYNC_MINUTE, second=0, microsecond=0)
-        if next_sync_time < now:
-            next_sync_time += timedelta(days=1)
-        delta = next_sync_time - now
-        hours, rem = divmod(int(delta.total_seconds()), 3600)
-        minutes = rem // 60
+        delta = next_sync_time(now) - now
+        hours, minutes = divmod(int(delta.total_seconds()) // 60, 60)
 
         embed = discord.Embed(
             title="📊 Company Status Overview",
             description="Summary for **Violent RE:Solutions**",
             color=discord.Color.blurple(),
-            timestamp=datetime.now()
+            timestamp=now
         )
         embed.add_field(name="🏢 Company", value="Violent RE:Solutions", inline=True)
         embed.add_field(name="💪 Trains Available", value=str(trains), inline=True)
@@ -351,10 +818,10 @@ async def status(interaction: discord.Interaction):
         embed.add_field(name="🔄 Next Sync", value=f"In {hours}h {minutes}m (19:30 UK)", inline=False)
         embed.add_field(name="🎯 Rotation Progress", value=f"{trained_count}/{total} trained", inline=True)
         embed.set_footer(text="Updated via Torn API")
-        await interaction.followup.send(embed=embed)
+        await interaction.response.send_message(embed=embed)
     except Exception:
         logging.exception("Error in /status")
-        await interaction.followup.send("⚠️ Failed to retrieve status.", ephemeral=True)
+        await interaction.response.send_message("⚠️ Failed to retrieve status.", ephemeral=True)
 
 @guild_only()
 @bot.tree.command(
@@ -380,21 +847,14 @@ async def status_error(interaction: discord.Interaction, error: app_commands.App
 @bot.tree.command(name="rotation", description="Show current rotation and trained status")
 @app_commands.check(company_role_check)
 async def rotation(interaction: discord.Interaction):
-    await interaction.response.defer()
     try:
-        data = load_data()
-        emps = data.get("employees", [])
-        trained = data.get("trained", {})
-        if not emps:
-            await interaction.followup.send("⚠️ No employees loaded. Try `/forceupdate` first.", ephemeral=True)
+        if not (await get_data()).employees:
+            await interaction.response.send_message("⚠️ No employees loaded. Try `/forceupdate` first.", ephemeral=True)
             return
-        lines = [f"{e} — {'✅' if trained.get(e) == 'Y' else '❌'}" for e in emps]
-        if all_trained(data):
-            lines.append("\n🔁 All trained — rotation will reset automatically on the next mark.")
-        await interaction.followup.send("\n".join(lines))
+        await interaction.response.send_message(store.rotation_text())
     except Exception:
         logging.exception("Error in /rotation")
-        await interaction.followup.send("⚠️ Error processing /rotation.", ephemeral=True)
+        await interaction.response.send_message("⚠️ Error processing /rotation.", ephemeral=True)
 
 @rotation.error
 async def rotation_error(interaction: discord.Interaction, error: app_commands.AppCommandError):
@@ -406,23 +866,14 @@ async def rotation_error(interaction: discord.Interaction, error: app_commands.A
 @bot.tree.command(name="remaining", description="Show employees who still need training this rotation")
 @app_commands.check(company_role_check)
 async def remaining(interaction: discord.Interaction):
-    await interaction.response.defer()
     try:
-        data = load_data()
-        emps = data.get("employees", [])
-        trained = data.get("trained", {})
-        if not emps:
-            await interaction.followup.send("⚠️ No employee data available yet. Try `/forceupdate`.", ephemeral=True)
+        if not (await get_data()).employees:
+            await interaction.response.send_message("⚠️ No employee data available yet. Try `/forceupdate`.", ephemeral=True)
             return
-        remaining_list = [e for e in emps if trained.get(e, "N") != "Y"]
-        if remaining_list:
-            msg = "**Employees left to train:**\n" + "\n".join([f"❌ {name}" for name in remaining_list])
-        else:
-            msg = "✅ All employees are trained this rotation!"
-        await interaction.followup.send(msg)
+        await interaction.response.send_message(store.remaining_text())
     except Exception:
         logging.exception("Error in /remaining")
-        await interaction.followup.send("⚠️ Error processing /remaining.", ephemeral=True)
+        await interaction.response.send_message("⚠️ Error processing /remaining.", ephemeral=True)
 
 @remaining.error
 async def remaining_error(interaction: discord.Interaction, error: app_commands.AppCommandError):
@@ -436,34 +887,32 @@ async def remaining_error(interaction: discord.Interaction, error: app_commands.
 async def train_cmd(interaction: discord.Interaction, name: str):
     await interaction.response.defer()  # public so the channel sees it
 
-    data = load_data()
-    employees = data.get("employees", [])
-    trained = data.setdefault("trained", {})
+    data = await get_data()
+    trained = data.trained
 
-    target = None
-    nkey = norm(name)
-    for e in employees:
-        if norm(e) == nkey:
-            target = e
-            break
+    target = store.name_index.get(norm(name))
 
     if not target:
         await interaction.followup.send(f"❌ Employee '{name}' not found in current rotation.", ephemeral=True)
         return
 
+    if trained.get(target) == "Y":
+        await interaction.followup.send(f"ℹ️ **{target}** is already trained this rotation.", ephemeral=True)
+        return
+
+    store.untrained.remove(target)
     trained[target] = "Y"
-    save_data(data)
+    store.mark_dirty()
 
     # Auto-reset when everyone is trained
-    if all_trained(data):
+    if all_trained():
         reset_rotation(data)
         await interaction.followup.send(
-            f"✅ Marked **{target}** as trained.\n🔁 All employees trained — rotation **reset** (cycle #{data['rotation_cycle']})."
+            f"✅ Marked **{target}** as trained.\n🔁 All employees trained — rotation **reset** (cycle #{data.rotation_cycle})."
         )
         return
 
-    remaining_list = [e for e in employees if data["trained"].get(e) != "Y"]
-    nxt = remaining_list[0] if remaining_list else "—"
+    nxt = store.untrained[0] if store.untrained else "—"
     await interaction.followup.send(f"✅ Marked **{target}** as trained.\n🔜 Next up: **{nxt}**")
 
 @train_cmd.error
@@ -478,13 +927,13 @@ async def train_error(interaction: discord.Interaction, error: app_commands.AppC
 async def resetrotation(interaction: discord.Interaction):
     await interaction.response.defer(ephemeral=True)
     try:
-        data = load_data()
-        if not data.get("employees"):
+        data = await get_data()
+        if not data.employees:
             await interaction.followup.send("⚠️ No employees loaded. Try `/forceupdate` first.", ephemeral=True)
             return
         reset_rotation(data)
         await interaction.followup.send(
-            f"🔁 Rotation has been **manually reset** (cycle #{data['rotation_cycle']}).",
+            f"🔁 Rotation has been **manually reset** (cycle #{data.rotation_cycle}).",
             ephemeral=False
         )
     except Exception:
@@ -496,6 +945,24 @@ async def resetrotation_error(interaction: discord.Interaction, error: app_comma
     if isinstance(error, app_commands.CheckFailure):
         await interaction.response.send_message("🚫 Directors only.", ephemeral=True)
 
+# /resync (director only)
+@guild_only()
+@bot.tree.command(name="resync", description="Director only: force a slash command sync with Discord")
+@app_commands.check(director_check)
+async def resync(interaction: discord.Interaction):
+    await interaction.response.defer(ephemeral=True)
+    try:
+        await sync_commands()
+        await interaction.followup.send("🔁 Slash commands synced.")
+    except Exception:
+        logging.exception("Failed to sync commands")
+        await interaction.followup.send("⚠️ Failed to sync commands.", ephemeral=True)
+
+@resync.error
+async def resync_error(interaction: discord.Interaction, error: app_commands.AppCommandError):
+    if isinstance(error, app_commands.CheckFailure):
+        await interaction.response.send_message("🚫 Directors only.", ephemeral=True)
+
 # Optional: prune old global commands once, then remove this command
 @guild_only()
 @bot.tree.command(name="prune_globals", description="Director only: remove any globally-registered commands")
@@ -505,6 +972,7 @@ async def prune_globals(interaction: discord.Interaction):
     try:
         bot.tree.clear_commands(guild=None)  # clear global defs locally
         await bot.tree.sync()                # push empty global set
+        write_sync_hash(None)                # force a full sync on next start
         await interaction.followup.send("🧹 Pruned global commands. All commands are now guild-scoped.")
     except Exception:
         logging.exception("Failed to prune global commands")
@@ -522,4 +990,7 @@ if __name__ == "__main__":
     if not DISCORD_TOKEN:
         raise SystemExit("Missing DISCORD_TOKEN in .env")
     bot.run(DISCORD_TOKEN)
+    # Persist anything the flusher hadn't written yet
+    if store.dirty:
+        save_data(asdict(store.data))
 